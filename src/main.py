@@ -2,17 +2,40 @@
 
 import base64
 import logging
+import threading
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 
 from routes.v1.app import v1
 from routes import health
+from services import salesforce
+from util import startup
 from util.settings import constants
 
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Red Hat Distributors API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up in the background so the app can serve liveness checks meanwhile.
+
+    Readiness is reported by /readyz once the warm-up has completed. Shutdown
+    doesn't wait for a warm-up still in progress.
+    """
+    stop = threading.Event()
+    threading.Thread(
+        target=startup.run,
+        args=(salesforce.warm_up, stop),
+        name="warm-up",
+        daemon=True,
+    ).start()
+    yield
+    stop.set()
+
+
+app = FastAPI(title="Red Hat Distributors API", lifespan=lifespan)
 
 
 class HealthCheckFilter(logging.Filter):
@@ -1,13 +1,23 @@
 """Health check endpoints."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
+
+from util import startup
 
 router = APIRouter(tags=["health"])
 
 
 @router.get("/")
 @router.get("/livez")
-@router.get("/readyz")
-def health():
+async def health():
     """Get app health status."""
     return {"status": "success"}
+
+
+@router.get("/readyz")
+async def readiness(response: Response):
+    """Get app readiness status, which is only successful once startup is done."""
+    if not startup.ready.is_set():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "starting"}
+    return {"status": "success"}
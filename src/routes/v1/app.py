@@ -1,8 +1,13 @@
 """FastAPI app for API v1."""
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 
 from routes.v1 import pricebook
+from util.deadline import DeadlineExceeded, DeadlineMiddleware, RequestCancelled
+
+# nginx's status for requests the client closed before a response was sent
+CLIENT_CLOSED_REQUEST = 499
 
 v1 = FastAPI(
     title="Red Hat Distributors API v1",
@@ -11,4 +16,25 @@ v1 = FastAPI(
     openapi_url="/openapi.json",
 )
 
+v1.add_middleware(DeadlineMiddleware)
+
+
+@v1.exception_handler(DeadlineExceeded)
+def deadline_exceeded(request: Request, exc: DeadlineExceeded):
+    """Respond to requests that ran out of time waiting on Salesforce."""
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "Request deadline exceeded"},
+    )
+
+
+@v1.exception_handler(RequestCancelled)
+def request_cancelled(request: Request, exc: RequestCancelled):
+    """Respond to requests whose client has already disconnected."""
+    return JSONResponse(
+        status_code=CLIENT_CLOSED_REQUEST,
+        content={"detail": "Client closed request"},
+    )
+
+
 v1.include_router(pricebook.router)
@@ -1,14 +1,69 @@
 """Pricebook API endpoints."""
 
-from fastapi import APIRouter
+import math
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
 
-from services import salesforce
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
-router = APIRouter(tags=["pricebook"])
+from services import salesforce
+from util import deadline, identity, ratelimit
+from util.settings import constants
 
 # TODO: determine this from header
 mdmId = "MDM-12345"
 
+# rate limit key for callers without an org in their x-rh-identity header
+UNIDENTIFIED = "unidentified"
+
+
+async def rate_limit(request: Request) -> AsyncIterator[None]:
+    """Rate limit the caller, then wait for its share of upstream capacity.
+
+    Callers are told apart by the org in their x-rh-identity header, and those
+    without one share a single limit. This runs on the event loop, so waiting
+    for a slot doesn't hold a worker thread that the endpoints holding a slot
+    need.
+    """
+    partner = identity.org_id(request.headers.get(identity.HEADER)) or UNIDENTIFIED
+    endpoint: str = request.scope["route"].path
+    retry_after = ratelimit.limiter.acquire(partner, endpoint)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    timeout: float = constants.UPSTREAM_QUEUE_TIMEOUT_SECONDS
+    request_deadline = deadline.current()
+    if request_deadline is not None:
+        timeout = min(timeout, request_deadline.check())
+
+    async with AsyncExitStack() as stack:
+        try:
+            await stack.enter_async_context(
+                ratelimit.upstream.slot(partner, timeout, request_deadline)
+            )
+        except ratelimit.PartnerBusy:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests in progress",
+                headers={"Retry-After": "1"},
+            )
+        except (ratelimit.QueueFull, TimeoutError):
+            if request_deadline is not None:
+                request_deadline.check()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Salesforce is busy",
+                headers={"Retry-After": "1"},
+            )
+        yield
+
+
+router = APIRouter(tags=["pricebook"], dependencies=[Depends(rate_limit)])
+
 
 @router.get("/PricebookList")
 def get_pricebook_list():
@@ -1,40 +1,178 @@
 """Salesforce integration service."""
 
 import base64
+import json
+import threading
 from logging import Logger
-from typing import Any
-
-import jks
-from simple_salesforce import Salesforce
+from typing import TYPE_CHECKING, Any
 
+from util import deadline, startup
 from util.logger import get_logger
 from util.settings import constants
 
+# jks, requests and simple_salesforce take several hundred milliseconds to
+# import, so they are imported where they're first used
+if TYPE_CHECKING:
+    from requests import Session
+    from simple_salesforce import Salesforce
+
 log: Logger = get_logger(__name__)
 
+CHUNK_SIZE = 16 * 1024
+
+_client: "Salesforce | None" = None
+_client_lock = threading.Lock()
+
 
 def execute_apex(endpoint: str, method: str, data: dict) -> Any:
-    """Execute Salesforce Apex REST API call."""
-    sf: Salesforce = _get_salesforce()
-    return sf.apexecute(endpoint, method=method, data=data)
+    """Execute Salesforce Apex REST API call.
+
+    Within a request the call is skipped once the client has disconnected, and
+    limited to the time left before the request's deadline.
+    """
+    from simple_salesforce.exceptions import SalesforceExpiredSession
+
+    try:
+        return _apexecute(endpoint, method, data)
+    except SalesforceExpiredSession:
+        log.info("Salesforce session expired, reconnecting")
+        _reset_client()
+        return _apexecute(endpoint, method, data)
+
+
+def _apexecute(endpoint: str, method: str, data: dict) -> Any:
+    import requests
+
+    request_deadline = deadline.current()
+    if request_deadline is None:
+        return _get_client().apexecute(endpoint, method=method, data=data)
 
+    # checked after getting the client, as logging in again takes time too
+    sf: Salesforce = _get_client()
+    remaining: float = request_deadline.check()
+    connect = min(constants.SALESFORCE_CONNECT_TIMEOUT_SECONDS, remaining / 2)
+    try:
+        return _apexecute_streamed(
+            sf, endpoint, method, data, request_deadline, (connect, remaining - connect)
+        )
+    except requests.exceptions.Timeout as e:
+        deadline.record_abandoned("upstream_timeout")
+        raise deadline.DeadlineExceeded() from e
+
+
+def _apexecute_streamed(
+    sf: "Salesforce",
+    endpoint: str,
+    method: str,
+    data: dict,
+    request_deadline: deadline.Deadline,
+    timeout: tuple[float, float],
+) -> Any:
+    """Execute an Apex call like Salesforce.apexecute, reading the body in chunks.
+
+    The connect and read timeouts add up to the time left, which bounds the wait
+    for the response headers. The body is read in chunks, and reading stops
+    once the client has disconnected or the deadline has passed.
+    """
+    # mirrors Salesforce.apexecute in simple-salesforce 1.12, which can't stream
+    response = sf._call_salesforce(
+        method,
+        sf.apex_url + endpoint,
+        name="apexecute",
+        data=json.dumps(data) if data is not None else None,
+        stream=True,
+        timeout=timeout,
+    )
+
+    import requests
+
+    # closing the response before the body is read drops the connection
+    with response:
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if request_deadline.cancelled.is_set():
+                deadline.record_abandoned("cancelled_in_flight")
+                raise deadline.RequestCancelled()
+            if not request_deadline.remaining():
+                raise requests.exceptions.Timeout()
+            body += chunk
+
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body.decode(response.encoding or "utf-8", errors="replace")
 
-def _get_salesforce() -> Salesforce:
-    private_key: str = _get_private_key()
 
+def warm_up() -> None:
+    """Load the keystore and authenticate before the first request needs them."""
+    global _client
+
+    with startup.phase("keystore"):
+        private_key: str = _get_private_key()
+    with startup.phase("authenticate"):
+        client = _connect(private_key)
+
+    with _client_lock:
+        _client = client
+
+
+def _get_client() -> "Salesforce":
+    global _client
+
+    client = _client
+    if client is not None:
+        return client
+
+    # log in without holding the lock, so a slow login only holds up its caller
+    client = _get_salesforce()
+    with _client_lock:
+        if _client is None:
+            _client = client
+        return _client
+
+
+def _reset_client() -> None:
+    global _client
+
+    with _client_lock:
+        _client = None
+
+
+def _get_salesforce() -> "Salesforce":
+    return _connect(_get_private_key())
+
+
+def _connect(private_key: str) -> "Salesforce":
     log.info(
         f"Connecting to Salesforce: https://{constants.SALESFORCE_DOMAIN}.salesforce.com"
     )
 
+    from simple_salesforce import Salesforce
+
     return Salesforce(
         domain=constants.SALESFORCE_DOMAIN,
         username=constants.SALESFORCE_USERNAME,
         consumer_key=constants.SALESFORCE_CONSUMER_KEY.get_secret_value(),
         privatekey=private_key,
+        session=_session(),
     )
 
 
+def _session() -> "Session":
+    """Create a session whose calls, including the login, time out by default."""
+    import requests
+
+    class TimeoutSession(requests.Session):
+        def request(self, method, url, *args, **kwargs):
+            kwargs.setdefault("timeout", constants.SALESFORCE_TIMEOUT_SECONDS)
+            return super().request(method, url, *args, **kwargs)
+
+    return TimeoutSession()
+
+
 def _get_private_key() -> str:
+    import jks
+
     try:
         keystore = jks.KeyStore.load(
             constants.SALESFORCE_KEYSTORE_PATH,
@@ -0,0 +1,137 @@
+"""Per-request deadlines and cancellation when the client disconnects."""
+
+import asyncio
+import math
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from logging import Logger
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from util.logger import get_logger
+from util.settings import constants
+
+log: Logger = get_logger(__name__)
+
+HEADER = "x-request-timeout"
+
+# upstream work abandoned because the deadline passed or the client went away
+abandoned: Counter[str] = Counter()
+
+
+class DeadlineExceeded(Exception):
+    """The request ran out of time before Salesforce answered."""
+
+
+class RequestCancelled(Exception):
+    """The client disconnected before the request was served."""
+
+
+class Deadline:
+    """Time budget for a single request."""
+
+    def __init__(self, seconds: float):
+        """Start a budget of seconds from now."""
+        self.expires = time.monotonic() + seconds
+        # checked from worker threads, and awaited on the event loop
+        self.cancelled = threading.Event()
+        self._cancelled = asyncio.Event()
+
+    def cancel(self) -> None:
+        """Cancel the request, from the event loop."""
+        self.cancelled.set()
+        self._cancelled.set()
+
+    async def wait_cancelled(self) -> None:
+        """Wait until the request is cancelled."""
+        await self._cancelled.wait()
+
+    def remaining(self) -> float:
+        """Get the seconds left in the budget."""
+        return max(0.0, self.expires - time.monotonic())
+
+    def check(self) -> float:
+        """Get the seconds left, before starting work on behalf of the request.
+
+        Raises:
+            RequestCancelled: If the client has disconnected.
+            DeadlineExceeded: If the budget has been used up.
+        """
+        if self.cancelled.is_set():
+            record_abandoned("cancelled")
+            raise RequestCancelled()
+
+        remaining = self.remaining()
+        if remaining <= 0:
+            record_abandoned("deadline_exceeded")
+            raise DeadlineExceeded()
+        return remaining
+
+
+_current: ContextVar[Deadline | None] = ContextVar("deadline", default=None)
+
+
+def current() -> Deadline | None:
+    """Get the deadline of the request being served, if any."""
+    return _current.get()
+
+
+def record_abandoned(reason: str) -> None:
+    """Count upstream work abandoned for reason."""
+    abandoned[reason] += 1
+    log.info(f"Abandoned upstream work ({reason}), totals: {dict(abandoned)}")
+
+
+def budget(headers: dict[str, str]) -> float:
+    """Get the request's time budget in seconds.
+
+    The budget requested in the x-request-timeout header is used when it is
+    shorter than REQUEST_TIMEOUT_SECONDS.
+    """
+    try:
+        requested = float(headers.get(HEADER, ""))
+    except ValueError:
+        return constants.REQUEST_TIMEOUT_SECONDS
+
+    if not math.isfinite(requested) or requested <= 0:
+        return constants.REQUEST_TIMEOUT_SECONDS
+    return min(requested, constants.REQUEST_TIMEOUT_SECONDS)
+
+
+class DeadlineMiddleware:
+    """Give each request a deadline and cancel it when the client disconnects."""
+
+    def __init__(self, app: ASGIApp):
+        """Wrap app."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve the request while watching for the client to disconnect."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {
+            k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]
+        }
+        request_deadline = Deadline(budget(headers))
+        messages: asyncio.Queue[Message] = asyncio.Queue()
+
+        async def watch() -> None:
+            # relay messages to the app, so the body can still be read
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    request_deadline.cancel()
+                    return
+
+        token = _current.set(request_deadline)
+        watcher = asyncio.create_task(watch())
+        try:
+            await self.app(scope, messages.get, send)
+        finally:
+            watcher.cancel()
+            _current.reset(token)
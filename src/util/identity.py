@@ -0,0 +1,27 @@
+"""Caller identity from the x-rh-identity header."""
+
+import base64
+import binascii
+import json
+
+HEADER = "x-rh-identity"
+
+
+def org_id(rh_identity: str | None) -> str | None:
+    """Get the caller's org ID from a base64 encoded x-rh-identity header.
+
+    Returns:
+        str | None: The org ID, or None if the header is missing or invalid.
+    """
+    if not rh_identity:
+        return None
+
+    try:
+        identity = json.loads(base64.b64decode(rh_identity, validate=True))
+    except (binascii.Error, ValueError):
+        return None
+
+    if not isinstance(identity, dict) or not isinstance(identity.get("identity"), dict):
+        return None
+    org = identity["identity"].get("org_id")
+    return str(org) if org else None
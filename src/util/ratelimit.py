@@ -0,0 +1,200 @@
+"""Per-partner rate limiting and fair queuing of upstream calls."""
+
+import asyncio
+import threading
+import time
+from asyncio import FIRST_COMPLETED
+from collections import Counter, OrderedDict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from util import deadline
+from util.settings import constants
+
+
+class TokenBucket:
+    """Token bucket refilled at rate tokens per second, holding at most burst."""
+
+    def __init__(self, rate: float, burst: int):
+        """Create a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def acquire(self, cost: float = 1) -> float:
+        """Take cost tokens from the bucket.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the seconds until they
+            will be available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets per partner and endpoint, held in memory."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        endpoints: dict[str, tuple[float, int]] | None = None,
+    ):
+        """Create a limiter with a default limit and optional per-endpoint limits."""
+        self.rate = rate
+        self.burst = burst
+        self.endpoints = endpoints or {}
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, partner: str, endpoint: str, cost: float = 1) -> float:
+        """Take cost tokens from the partner's bucket for endpoint.
+
+        Returns:
+            float: 0 if the request is allowed, otherwise the seconds to wait
+            before retrying.
+        """
+        with self._lock:
+            bucket = self._buckets.get((partner, endpoint))
+            if bucket is None:
+                rate, burst = self.endpoints.get(endpoint, (self.rate, self.burst))
+                bucket = self._buckets[(partner, endpoint)] = TokenBucket(rate, burst)
+            return bucket.acquire(cost)
+
+
+class PartnerBusy(Exception):
+    """The partner already has as many requests in progress as it may."""
+
+
+class QueueFull(Exception):
+    """Too many requests are already waiting for an upstream slot."""
+
+
+class FairQueue:
+    """Limit concurrent upstream calls, sharing free slots round-robin by partner.
+
+    Requests wait on the event loop rather than on a worker thread, so the
+    queue is only meant to be used from the event loop.
+    """
+
+    def __init__(self, slots: int, max_waiting: int, per_partner: int):
+        """Create a queue allowing slots concurrent calls.
+
+        At most max_waiting requests may wait for a slot, and each partner may
+        have at most per_partner requests waiting or holding a slot.
+        """
+        self._free = slots
+        self._max_waiting = max_waiting
+        self._per_partner = per_partner
+        self._active: Counter[str] = Counter()
+        self._waiting: OrderedDict[str, deque[asyncio.Future[None]]] = OrderedDict()
+        self._queued = 0
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        partner: str,
+        timeout: float | None = None,
+        request_deadline: deadline.Deadline | None = None,
+    ) -> AsyncIterator[None]:
+        """Hold an upstream slot, waiting for the partner's turn if none is free.
+
+        Raises:
+            PartnerBusy: If the partner already has per_partner requests.
+            QueueFull: If max_waiting requests are already waiting.
+            RequestCancelled: If request_deadline is cancelled while waiting.
+            TimeoutError: If no slot was granted within timeout seconds.
+        """
+        if self._active[partner] >= self._per_partner:
+            raise PartnerBusy()
+        available = self._free > 0 and not self._waiting
+        if not available and self._queued >= self._max_waiting:
+            raise QueueFull()
+
+        self._active[partner] += 1
+        try:
+            if available:
+                self._free -= 1
+            else:
+                await self._wait(partner, timeout, request_deadline)
+            try:
+                yield
+            finally:
+                self._release()
+        finally:
+            self._active[partner] -= 1
+            if not self._active[partner]:
+                del self._active[partner]
+
+    async def _wait(
+        self,
+        partner: str,
+        timeout: float | None,
+        request_deadline: deadline.Deadline | None,
+    ) -> None:
+        granted: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(partner, deque()).append(granted)
+        self._queued += 1
+
+        waits: set[asyncio.Future[None]] = {granted}
+        if request_deadline is not None:
+            waits.add(asyncio.ensure_future(request_deadline.wait_cancelled()))
+        try:
+            await asyncio.wait(waits, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not granted.done():
+                if request_deadline is not None:
+                    request_deadline.check()
+                raise TimeoutError(f"No upstream slot available within {timeout}s")
+        except BaseException:
+            if granted.done():
+                # the slot was handed over just as the wait ended
+                self._release()
+            else:
+                granted.cancel()
+                self._remove(partner, granted)
+            raise
+        finally:
+            for wait in waits - {granted}:
+                wait.cancel()
+
+    def _remove(self, partner: str, granted: asyncio.Future[None]) -> None:
+        queue = self._waiting[partner]
+        queue.remove(granted)
+        self._queued -= 1
+        if not queue:
+            del self._waiting[partner]
+
+    def _release(self) -> None:
+        if not self._waiting:
+            self._free += 1
+            return
+
+        # hand the slot to the partner at the front, then send it to the back
+        partner, queue = next(iter(self._waiting.items()))
+        granted = queue.popleft()
+        self._queued -= 1
+        if queue:
+            self._waiting.move_to_end(partner)
+        else:
+            del self._waiting[partner]
+        granted.set_result(None)
+
+
+limiter = RateLimiter(
+    constants.RATE_LIMIT_PER_SECOND,
+    constants.RATE_LIMIT_BURST,
+    constants.RATE_LIMIT_ENDPOINTS,
+)
+upstream = FairQueue(
+    constants.UPSTREAM_CONCURRENCY,
+    constants.UPSTREAM_QUEUE_LIMIT,
+    constants.RATE_LIMIT_PARTNER_CONCURRENCY,
+)
@@ -1,6 +1,6 @@
 """Application settings and configuration."""
 
-from pydantic import SecretStr
+from pydantic import Field, PositiveFloat, PositiveInt, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,6 +16,29 @@ class Settings(BaseSettings):
 
     LOG_LEVEL: str = "INFO"
 
+    STARTUP_RETRY_SECONDS: PositiveFloat = 10
+    # timeout for Salesforce calls made outside a request, such as the login
+    SALESFORCE_TIMEOUT_SECONDS: PositiveFloat = 30
+    # part of a request's remaining time allowed for connecting to Salesforce
+    SALESFORCE_CONNECT_TIMEOUT_SECONDS: PositiveFloat = 5
+
+    # requests per second and burst size allowed for each partner, per endpoint
+    RATE_LIMIT_PER_SECOND: PositiveFloat = 5
+    RATE_LIMIT_BURST: PositiveInt = 10
+    # overrides keyed by endpoint path, e.g. {"/Pricebook": [1, 5]}
+    RATE_LIMIT_ENDPOINTS: dict[str, tuple[PositiveFloat, PositiveInt]] = {}
+    # requests a partner may have waiting for or holding an upstream slot
+    RATE_LIMIT_PARTNER_CONCURRENCY: PositiveInt = 5
+
+    # longest time a request may take, clients can ask for less with x-request-timeout
+    REQUEST_TIMEOUT_SECONDS: PositiveFloat = 30
+
+    # upstream calls each hold one of anyio's 40 worker threads, so keep enough
+    # of them free for the rest of the app
+    UPSTREAM_CONCURRENCY: PositiveInt = Field(default=10, le=20)
+    UPSTREAM_QUEUE_LIMIT: PositiveInt = 100
+    UPSTREAM_QUEUE_TIMEOUT_SECONDS: PositiveFloat = 30
+
     SALESFORCE_DOMAIN: str
     SALESFORCE_USERNAME: str
     SALESFORCE_CONSUMER_KEY: SecretStr
@@ -0,0 +1,47 @@
+"""Startup warm-up, phase timings and readiness state."""
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from logging import Logger
+
+from util.logger import get_logger
+from util.settings import constants
+
+log: Logger = get_logger(__name__)
+
+ready = threading.Event()
+timings: dict[str, float] = {}
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a startup phase and record its duration in seconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = time.perf_counter() - start
+        log.info(f"Startup phase '{name}' took {timings[name] * 1000:.0f}ms")
+
+
+def run(warm_up: Callable[[], None], stop: threading.Event) -> None:
+    """Run warm_up until it succeeds, then mark the app as ready.
+
+    Failed attempts are retried every STARTUP_RETRY_SECONDS until stop is set.
+    """
+    while not stop.is_set():
+        try:
+            with phase("warm_up"):
+                warm_up()
+        except Exception:
+            log.exception(
+                f"Startup warm-up failed, retrying in {constants.STARTUP_RETRY_SECONDS}s"
+            )
+            stop.wait(constants.STARTUP_RETRY_SECONDS)
+            continue
+
+        ready.set()
+        log.info("Startup complete, ready to accept traffic")
+        return
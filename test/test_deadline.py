@@ -0,0 +1,125 @@
+"""Tests for request deadlines and cancellation."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.util import deadline
+from src.util.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    DeadlineMiddleware,
+    RequestCancelled,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_abandoned():
+    """Reset the abandoned work counters between tests."""
+    deadline.abandoned.clear()
+    yield
+    deadline.abandoned.clear()
+
+
+class TestDeadline:
+    """Test deadline budgets."""
+
+    def test_check_returns_remaining(self):
+        """Test that the remaining budget is returned while there is time left."""
+        assert 0 < Deadline(5).check() <= 5
+
+    def test_check_expired(self):
+        """Test that an expired deadline is reported and counted."""
+        with pytest.raises(DeadlineExceeded):
+            Deadline(0).check()
+
+        assert deadline.abandoned["deadline_exceeded"] == 1
+
+    def test_check_cancelled(self):
+        """Test that a cancelled request is reported and counted."""
+        request_deadline = Deadline(5)
+        request_deadline.cancelled.set()
+
+        with pytest.raises(RequestCancelled):
+            request_deadline.check()
+
+        assert deadline.abandoned["cancelled"] == 1
+
+    def test_wait_cancelled(self):
+        """Test that waiting for cancellation ends once the request is cancelled."""
+        request_deadline = Deadline(5)
+
+        async def run():
+            waiting = asyncio.create_task(request_deadline.wait_cancelled())
+            await asyncio.sleep(0)
+            request_deadline.cancel()
+            await asyncio.wait_for(waiting, timeout=1)
+
+        asyncio.run(run())
+
+        assert request_deadline.cancelled.is_set()
+
+    @patch("src.util.deadline.constants.REQUEST_TIMEOUT_SECONDS", 30)
+    @pytest.mark.parametrize(
+        "headers, expected",
+        [
+            ({}, 30),
+            ({"x-request-timeout": "5"}, 5),
+            ({"x-request-timeout": "0.5"}, 0.5),
+            ({"x-request-timeout": "120"}, 30),
+            ({"x-request-timeout": "-1"}, 30),
+            ({"x-request-timeout": "soon"}, 30),
+            ({"x-request-timeout": "nan"}, 30),
+            ({"x-request-timeout": "inf"}, 30),
+        ],
+    )
+    def test_budget(self, headers, expected):
+        """Test that the header can shorten but not extend the configured budget."""
+        assert deadline.budget(headers) == expected
+
+
+class TestDeadlineMiddleware:
+    """Test the deadline ASGI middleware."""
+
+    def _scope(self, headers: list[tuple[bytes, bytes]]) -> dict:
+        return {"type": "http", "headers": headers}
+
+    def test_sets_deadline(self):
+        """Test that the app sees a deadline using the requested budget."""
+        seen: list[Deadline | None] = []
+
+        async def app(scope, receive, send):
+            seen.append(deadline.current())
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        scope = self._scope([(b"x-request-timeout", b"2")])
+        asyncio.run(DeadlineMiddleware(app)(scope, receive, None))
+
+        assert seen[0] is not None
+        assert 0 < seen[0].remaining() <= 2
+        assert deadline.current() is None
+
+    def test_cancels_on_disconnect(self):
+        """Test that the deadline is cancelled when the client disconnects."""
+        seen: list[Deadline] = []
+
+        async def app(scope, receive, send):
+            assert (await receive())["type"] == "http.request"
+            assert (await receive())["type"] == "http.disconnect"
+            seen.append(deadline.current())
+
+        messages = [
+            {"type": "http.request", "body": b"", "more_body": False},
+            {"type": "http.disconnect"},
+        ]
+
+        async def receive():
+            return messages.pop(0)
+
+        asyncio.run(DeadlineMiddleware(app)(self._scope([]), receive, None))
+
+        assert seen[0].cancelled.is_set()
+        assert seen[0]._cancelled.is_set()
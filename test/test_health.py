@@ -1,7 +1,21 @@
 """Tests for health check routes."""
 
+from unittest.mock import patch
+
+import pytest
 from fastapi.testclient import TestClient
 
+from src.main import app
+from src.routes.health import startup
+
+
+@pytest.fixture
+def ready():
+    """Mark startup as complete for the duration of a test."""
+    startup.ready.set()
+    yield
+    startup.ready.clear()
+
 
 def test_health_root(client: TestClient):
     """Test the root health endpoint."""
@@ -17,8 +31,30 @@ def test_health_livez(client: TestClient):
     assert response.json() == {"status": "success"}
 
 
-def test_health_readyz(client: TestClient):
+def test_health_readyz(client: TestClient, ready):
     """Test the readyz health endpoint."""
     response = client.get("/readyz")
     assert response.status_code == 200
     assert response.json() == {"status": "success"}
+
+
+def test_health_readyz_before_startup(client: TestClient):
+    """Test that readyz fails until the startup warm-up has completed."""
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json() == {"status": "starting"}
+
+
+@patch("src.main.salesforce.warm_up")
+def test_health_readyz_after_lifespan_warm_up(mock_warm_up):
+    """Test that the app lifespan runs the warm-up and then reports ready."""
+    try:
+        with TestClient(app) as client:
+            assert startup.ready.wait(timeout=5)
+            response = client.get("/readyz")
+    finally:
+        startup.ready.clear()
+
+    mock_warm_up.assert_called_once()
+    assert response.status_code == 200
+    assert response.json() == {"status": "success"}
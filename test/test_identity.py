@@ -0,0 +1,38 @@
+"""Tests for caller identity."""
+
+import base64
+import json
+
+import pytest
+from src.util import identity
+
+
+def encode(value) -> str:
+    """Encode value like an x-rh-identity header."""
+    return base64.b64encode(json.dumps(value).encode()).decode()
+
+
+class TestOrgId:
+    """Test getting the org ID from the x-rh-identity header."""
+
+    def test_org_id(self):
+        """Test that the org ID is read from the identity."""
+        header = encode({"identity": {"org_id": "12345", "type": "User"}})
+
+        assert identity.org_id(header) == "12345"
+
+    @pytest.mark.parametrize(
+        "header",
+        [
+            None,
+            "",
+            "not base64!",
+            base64.b64encode(b"not json").decode(),
+            encode(["identity"]),
+            encode({"identity": "12345"}),
+            encode({"identity": {"type": "User"}}),
+        ],
+    )
+    def test_org_id_missing(self, header):
+        """Test that a missing or invalid header has no org ID."""
+        assert identity.org_id(header) is None
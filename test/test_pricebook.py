@@ -1,11 +1,25 @@
 """Tests for pricebook routes."""
 
+import asyncio
+import base64
+import json
+import time
+
+import httpx
 import pytest
 from unittest.mock import patch
 from fastapi.testclient import TestClient
+from src.routes.v1.app import v1
+from src.routes.v1.pricebook import deadline, ratelimit
 from test.conftest import get_api_endpoint
 
 
+def rh_identity(org_id: str) -> dict[str, str]:
+    """Get headers identifying the caller as org_id."""
+    identity = {"identity": {"org_id": org_id, "type": "User"}}
+    return {"x-rh-identity": base64.b64encode(json.dumps(identity).encode()).decode()}
+
+
 class TestPricebookRoutes:
     """Test pricebook API endpoints."""
 
@@ -106,3 +120,172 @@ class TestPricebookRoutes:
 
         with pytest.raises(Exception, match="Salesforce connection error"):
             authenticated_client.get(f"{get_api_endpoint('v1')}/PricebookList")
+
+
+class TestPricebookRateLimit:
+    """Test rate limiting of pricebook API endpoints."""
+
+    @patch(
+        "src.routes.v1.pricebook.ratelimit.limiter",
+        ratelimit.RateLimiter(rate=0.1, burst=1),
+    )
+    @patch("src.routes.v1.pricebook.salesforce.execute_apex")
+    def test_rate_limit_exceeded(
+        self, mock_execute_apex, authenticated_client: TestClient
+    ):
+        """Test that requests over the partner's limit get a 429."""
+        mock_execute_apex.return_value = {"bands": []}
+
+        first = authenticated_client.get(f"{get_api_endpoint('v1')}/DiscountBands")
+        second = authenticated_client.get(f"{get_api_endpoint('v1')}/DiscountBands")
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert second.headers["Retry-After"] == "10"
+        mock_execute_apex.assert_called_once()
+
+    @patch(
+        "src.routes.v1.pricebook.ratelimit.limiter",
+        ratelimit.RateLimiter(rate=0.1, burst=1),
+    )
+    @patch("src.routes.v1.pricebook.salesforce.execute_apex")
+    def test_rate_limit_per_org(
+        self, mock_execute_apex, authenticated_client: TestClient
+    ):
+        """Test that each org in the x-rh-identity header has its own budget."""
+        mock_execute_apex.return_value = {"bands": []}
+        url = f"{get_api_endpoint('v1')}/DiscountBands"
+
+        statuses = [
+            authenticated_client.get(url, headers=rh_identity(org)).status_code
+            for org in ["org-1", "org-2", "org-1"]
+        ]
+
+        assert statuses == [200, 200, 429]
+
+    @patch(
+        "src.routes.v1.pricebook.ratelimit.upstream",
+        ratelimit.FairQueue(slots=10, max_waiting=10, per_partner=1),
+    )
+    @patch("src.routes.v1.pricebook.ratelimit.limiter")
+    @patch("src.routes.v1.pricebook.salesforce.execute_apex")
+    def test_rate_limit_keyed_on_org(self, mock_execute_apex, mock_limiter):
+        """Test that the limiter and queue are keyed on the caller's org."""
+        mock_limiter.acquire.return_value = 0
+        client = TestClient(v1)
+
+        identified = client.get("/DiscountBands", headers=rh_identity("org-1"))
+        unidentified = client.get("/DiscountBands")
+
+        assert identified.status_code == 200
+        assert unidentified.status_code == 200
+        assert [c.args[0] for c in mock_limiter.acquire.call_args_list] == [
+            "org-1",
+            "unidentified",
+        ]
+
+    @patch(
+        "src.routes.v1.pricebook.ratelimit.limiter",
+        ratelimit.RateLimiter(rate=0.1, burst=1),
+    )
+    @patch("src.routes.v1.pricebook.salesforce.execute_apex")
+    def test_rate_limit_per_endpoint(
+        self, mock_execute_apex, authenticated_client: TestClient
+    ):
+        """Test that each endpoint has its own budget."""
+        mock_execute_apex.return_value = {}
+
+        bands = authenticated_client.get(f"{get_api_endpoint('v1')}/DiscountBands")
+        pricebooks = authenticated_client.get(f"{get_api_endpoint('v1')}/PricebookList")
+
+        assert bands.status_code == 200
+        assert pricebooks.status_code == 200
+
+    @patch("src.routes.v1.pricebook.constants.UPSTREAM_QUEUE_TIMEOUT_SECONDS", 0.01)
+    @patch(
+        "src.routes.v1.pricebook.ratelimit.upstream",
+        ratelimit.FairQueue(slots=0, max_waiting=10, per_partner=10),
+    )
+    @patch("src.routes.v1.pricebook.salesforce.execute_apex")
+    def test_upstream_busy(self, mock_execute_apex, authenticated_client: TestClient):
+        """Test that a request gets a 503 when no upstream slot frees up in time."""
+        response = authenticated_client.get(f"{get_api_endpoint('v1')}/DiscountBands")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        mock_execute_apex.assert_not_called()
+
+    @patch(
+        "src.routes.v1.pricebook.ratelimit.upstream",
+        ratelimit.FairQueue(slots=10, max_waiting=10, per_partner=0),
+    )
+    @patch("src.routes.v1.pricebook.salesforce.execute_apex")
+    def test_partner_busy(self, mock_execute_apex, authenticated_client: TestClient):
+        """Test that a partner with too many requests in progress gets a 429."""
+        response = authenticated_client.get(f"{get_api_endpoint('v1')}/DiscountBands")
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        mock_execute_apex.assert_not_called()
+
+    @patch(
+        "src.routes.v1.pricebook.ratelimit.limiter",
+        ratelimit.RateLimiter(rate=1, burst=100),
+    )
+    @patch(
+        "src.routes.v1.pricebook.ratelimit.upstream",
+        ratelimit.FairQueue(slots=10, max_waiting=100, per_partner=100),
+    )
+    @patch("src.routes.v1.pricebook.salesforce.execute_apex")
+    def test_queue_beyond_worker_threads(self, mock_execute_apex):
+        """Test that more waiting requests than worker threads don't stall the queue."""
+        mock_execute_apex.side_effect = lambda *args: time.sleep(0.2) or {}
+
+        async def run() -> list[int]:
+            transport = httpx.ASGITransport(app=v1)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                responses = await asyncio.gather(
+                    *[client.get("/DiscountBands") for _ in range(60)]
+                )
+            return [response.status_code for response in responses]
+
+        start = time.perf_counter()
+        statuses = asyncio.run(run())
+
+        assert statuses == [200] * 60
+        # 6 rounds of 10 upstream calls, rather than waiting out the queue timeout
+        assert time.perf_counter() - start < 3
+
+
+class TestPricebookDeadline:
+    """Test request deadlines of pricebook API endpoints."""
+
+    @patch("src.routes.v1.pricebook.salesforce.execute_apex")
+    def test_deadline_exceeded(
+        self, mock_execute_apex, authenticated_client: TestClient
+    ):
+        """Test that a request running out of time gets a 504."""
+        mock_execute_apex.side_effect = deadline.DeadlineExceeded()
+
+        response = authenticated_client.get(f"{get_api_endpoint('v1')}/DiscountBands")
+
+        assert response.status_code == 504
+
+    @patch("src.routes.v1.pricebook.salesforce.execute_apex")
+    def test_deadline_from_header(
+        self, mock_execute_apex, authenticated_client: TestClient
+    ):
+        """Test that the x-request-timeout header sets the request's budget."""
+        budgets: list[float] = []
+        mock_execute_apex.side_effect = lambda *args: budgets.append(
+            deadline.current().remaining()
+        )
+
+        authenticated_client.get(
+            f"{get_api_endpoint('v1')}/DiscountBands",
+            headers={"x-request-timeout": "2"},
+        )
+
+        assert 0 < budgets[0] <= 2
@@ -0,0 +1,200 @@
+"""Tests for rate limiting and fair queuing."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from src.util import ratelimit
+from src.util.ratelimit import (
+    FairQueue,
+    PartnerBusy,
+    QueueFull,
+    RateLimiter,
+    TokenBucket,
+)
+from src.util.settings import Settings
+
+
+class TestTokenBucket:
+    """Test token bucket refills and limits."""
+
+    def test_acquire_within_burst(self):
+        """Test that requests up to the burst size are allowed."""
+        bucket = TokenBucket(rate=1, burst=3)
+
+        assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+
+    @patch("src.util.ratelimit.time.monotonic")
+    def test_acquire_over_limit_returns_wait(self, mock_monotonic):
+        """Test that an empty bucket reports how long until a token is available."""
+        mock_monotonic.return_value = 100.0
+        bucket = TokenBucket(rate=2, burst=1)
+
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == pytest.approx(0.5)
+
+    @patch("src.util.ratelimit.time.monotonic")
+    def test_acquire_refills_over_time(self, mock_monotonic):
+        """Test that tokens are refilled at the configured rate."""
+        mock_monotonic.return_value = 100.0
+        bucket = TokenBucket(rate=2, burst=1)
+        bucket.acquire()
+
+        mock_monotonic.return_value = 100.5
+
+        assert bucket.acquire() == 0
+
+    def test_acquire_cheaper_cost(self):
+        """Test that a lower cost takes fewer tokens."""
+        bucket = TokenBucket(rate=1, burst=1)
+
+        assert bucket.acquire(0.5) == 0
+        assert bucket.acquire(0.5) == 0
+        assert bucket.acquire(0.5) > 0
+
+
+class TestRateLimiter:
+    """Test per-partner and per-endpoint limits."""
+
+    def test_partners_are_limited_separately(self):
+        """Test that one partner using its budget doesn't limit another."""
+        limiter = RateLimiter(rate=1, burst=1)
+
+        assert limiter.acquire("MDM-1", "/Pricebook") == 0
+        assert limiter.acquire("MDM-1", "/Pricebook") > 0
+        assert limiter.acquire("MDM-2", "/Pricebook") == 0
+
+    def test_endpoint_limits(self):
+        """Test that an endpoint can be given its own limit."""
+        limiter = RateLimiter(rate=1, burst=1, endpoints={"/PricebookList": (1, 3)})
+
+        assert limiter.acquire("MDM-1", "/Pricebook") == 0
+        assert limiter.acquire("MDM-1", "/Pricebook") > 0
+        assert [limiter.acquire("MDM-1", "/PricebookList") for _ in range(3)] == [
+            0,
+            0,
+            0,
+        ]
+
+
+class TestFairQueue:
+    """Test upstream slots and their fair sharing between partners."""
+
+    def test_slot_timeout(self):
+        """Test that waiting for a slot gives up after the timeout."""
+        queue = FairQueue(slots=1, max_waiting=10, per_partner=10)
+
+        async def run():
+            async with queue.slot("MDM-1"):
+                with pytest.raises(TimeoutError):
+                    async with queue.slot("MDM-2", timeout=0.01):
+                        pass
+
+            # the abandoned wait must not hold on to the slot
+            async with queue.slot("MDM-2", timeout=0.01):
+                pass
+
+        asyncio.run(run())
+
+    def test_slot_wait_ends_when_cancelled(self):
+        """Test that a request stops waiting for a slot once its client is gone."""
+        queue = FairQueue(slots=1, max_waiting=10, per_partner=10)
+        request_deadline = ratelimit.deadline.Deadline(30)
+
+        async def run():
+            async with queue.slot("MDM-1"):
+                waiting = asyncio.create_task(
+                    call_with_slot(queue, "MDM-2", request_deadline)
+                )
+                await asyncio.sleep(0)
+                request_deadline.cancel()
+                with pytest.raises(ratelimit.deadline.RequestCancelled):
+                    await asyncio.wait_for(waiting, timeout=1)
+
+            # the cancelled request must not be handed the freed slot
+            async with queue.slot("MDM-3", timeout=0.01):
+                pass
+
+        asyncio.run(run())
+
+    def test_slots_shared_round_robin(self):
+        """Test that a freed slot goes to the next partner rather than the busiest."""
+        queue = FairQueue(slots=1, max_waiting=10, per_partner=10)
+        order: list[str] = []
+
+        async def call(partner: str):
+            async with queue.slot(partner, timeout=5):
+                order.append(partner)
+
+        async def run():
+            async with queue.slot("MDM-1"):
+                tasks = []
+                for partner in ["MDM-1", "MDM-1", "MDM-1", "MDM-2"]:
+                    tasks.append(asyncio.create_task(call(partner)))
+                    # let the task queue up before starting the next one
+                    await asyncio.sleep(0)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+        assert order == ["MDM-1", "MDM-2", "MDM-1", "MDM-1"]
+
+    def test_partner_busy(self):
+        """Test that a partner can't have more than its share of requests."""
+        queue = FairQueue(slots=10, max_waiting=10, per_partner=1)
+
+        async def run():
+            async with queue.slot("MDM-1"):
+                with pytest.raises(PartnerBusy):
+                    async with queue.slot("MDM-1"):
+                        pass
+                async with queue.slot("MDM-2"):
+                    pass
+
+        asyncio.run(run())
+
+    def test_queue_full(self):
+        """Test that requests are turned away once the queue is full."""
+        queue = FairQueue(slots=1, max_waiting=1, per_partner=10)
+
+        async def run():
+            async with queue.slot("MDM-1"):
+                waiting = asyncio.create_task(call_with_slot(queue, "MDM-2"))
+                await asyncio.sleep(0)
+                with pytest.raises(QueueFull):
+                    async with queue.slot("MDM-3"):
+                        pass
+            await waiting
+
+        asyncio.run(run())
+
+
+async def call_with_slot(queue: FairQueue, partner: str, request_deadline=None):
+    """Hold a slot of queue for partner, waiting for it if need be."""
+    async with queue.slot(partner, timeout=5, request_deadline=request_deadline):
+        pass
+
+
+class TestSettings:
+    """Test validation of rate limit settings."""
+
+    @pytest.mark.parametrize(
+        "name",
+        [
+            "RATE_LIMIT_PER_SECOND",
+            "RATE_LIMIT_BURST",
+            "RATE_LIMIT_PARTNER_CONCURRENCY",
+            "UPSTREAM_CONCURRENCY",
+        ],
+    )
+    def test_must_be_positive(self, name):
+        """Test that limits of zero are rejected."""
+        with pytest.raises(ValidationError):
+            Settings(**{name: 0})
+
+    def test_concurrency_within_worker_threads(self):
+        """Test that upstream concurrency can't exceed the worker threads."""
+        with pytest.raises(ValidationError):
+            Settings(UPSTREAM_CONCURRENCY=41)
@@ -1,10 +1,23 @@
 """Tests for Salesforce service."""
 
+import io
+import sys
+
 import pytest
-from unittest.mock import patch, Mock
+import requests
+from unittest.mock import ANY, MagicMock, patch, Mock
 from simple_salesforce import Salesforce
+from simple_salesforce.exceptions import SalesforceError, SalesforceExpiredSession
 
-from src.services.salesforce import execute_apex, _get_salesforce, _get_private_key
+from src.services import salesforce
+from src.services.salesforce import deadline
+from src.services.salesforce import (
+    _get_private_key,
+    _get_salesforce,
+    _session,
+    execute_apex,
+    warm_up,
+)
 
 
 class MockBadKeystoreFormatException(Exception):
@@ -13,6 +26,22 @@ class MockBadKeystoreFormatException(Exception):
     pass
 
 
+@pytest.fixture
+def mock_jks():
+    """Replace the jks module imported by the Salesforce service."""
+    mock = Mock()
+    with patch.dict(sys.modules, {"jks": mock}):
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def reset_client():
+    """Drop the cached Salesforce client between tests."""
+    salesforce._client = None
+    yield
+    salesforce._client = None
+
+
 class TestSalesforceService:
     """Test Salesforce service functions."""
 
@@ -69,8 +98,91 @@ class TestSalesforceService:
         with pytest.raises(Exception, match="Salesforce API Error"):
             execute_apex("test/endpoint", "GET", {})
 
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_reuses_client(self, mock_get_salesforce):
+        """Test that the Salesforce session is reused across calls."""
+        # Arrange
+        mock_sf = Mock(spec=Salesforce)
+        mock_get_salesforce.return_value = mock_sf
+
+        # Act
+        execute_apex("test/endpoint", "GET", {})
+        execute_apex("test/endpoint", "GET", {})
+
+        # Assert
+        mock_get_salesforce.assert_called_once()
+        assert mock_sf.apexecute.call_count == 2
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_login_does_not_hold_client_lock(self, mock_get_salesforce):
+        """Test that other requests aren't blocked on the lock while logging in."""
+        # Arrange
+        lock_held: list[bool] = []
+        mock_get_salesforce.side_effect = lambda: (
+            lock_held.append(salesforce._client_lock.locked()) or Mock(spec=Salesforce)
+        )
+
+        # Act
+        execute_apex("test/endpoint", "GET", {})
+
+        # Assert
+        assert lock_held == [False]
+
+    @patch("src.services.salesforce.constants")
+    def test_session_default_timeout(self, mock_constants):
+        """Test that session calls, such as the login, time out by default."""
+        # Arrange
+        mock_constants.SALESFORCE_TIMEOUT_SECONDS = 7
+
+        with patch("requests.Session.request") as mock_request:
+            # Act
+            session = _session()
+            session.post("https://login.salesforce.com", data={})
+            session.request("GET", "https://example.com", timeout=2)
+
+        # Assert
+        assert mock_request.call_args_list[0].kwargs["timeout"] == 7
+        assert mock_request.call_args_list[1].kwargs["timeout"] == 2
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_reconnects_on_expired_session(self, mock_get_salesforce):
+        """Test that an expired session is replaced and the call retried."""
+        # Arrange
+        expired_sf = Mock(spec=Salesforce)
+        expired_sf.apexecute.side_effect = SalesforceExpiredSession(
+            "url", 401, "resource", "Session expired or invalid"
+        )
+        fresh_sf = Mock(spec=Salesforce)
+        fresh_sf.apexecute.return_value = {"result": "success"}
+        mock_get_salesforce.side_effect = [expired_sf, fresh_sf]
+
+        # Act
+        result = execute_apex("test/endpoint", "GET", {})
+
+        # Assert
+        assert result == {"result": "success"}
+        assert mock_get_salesforce.call_count == 2
+
     @patch("src.services.salesforce._get_private_key")
-    @patch("src.services.salesforce.Salesforce")
+    @patch("simple_salesforce.Salesforce")
+    def test_warm_up(self, mock_salesforce_class, mock_get_private_key):
+        """Test that warm-up connects ahead of the first Apex call."""
+        # Arrange
+        mock_sf = Mock(spec=Salesforce)
+        mock_salesforce_class.return_value = mock_sf
+
+        # Act
+        warm_up()
+        execute_apex("test/endpoint", "GET", {})
+
+        # Assert
+        mock_get_private_key.assert_called_once()
+        mock_salesforce_class.assert_called_once()
+        mock_sf.apexecute.assert_called_once()
+        assert {"keystore", "authenticate"} <= salesforce.startup.timings.keys()
+
+    @patch("src.services.salesforce._get_private_key")
+    @patch("simple_salesforce.Salesforce")
     def test_get_salesforce_success(self, mock_salesforce_class, mock_get_private_key):
         """Test successful Salesforce connection creation."""
         # Arrange
@@ -93,11 +205,12 @@ class TestSalesforceService:
             username="test@example.com",
             consumer_key="test-consumer-key",
             privatekey=mock_private_key,
+            session=ANY,
         )
 
     @patch("src.services.salesforce._get_private_key")
     @patch("src.services.salesforce.constants")
-    @patch("src.services.salesforce.Salesforce")
+    @patch("simple_salesforce.Salesforce")
     def test_get_salesforce_with_different_domain(
         self, mock_salesforce_class, mock_constants, mock_get_private_key
     ):
@@ -126,9 +239,9 @@ class TestSalesforceService:
             username="prod@company.com",
             consumer_key="prod_consumer_key",
             privatekey=mock_private_key,
+            session=ANY,
         )
 
-    @patch("src.services.salesforce.jks")
     @patch("src.services.salesforce.constants")
     def test_get_private_key_success(self, mock_constants, mock_jks):
         """Test successful private key extraction."""
@@ -164,7 +277,6 @@ class TestSalesforceService:
         mock_pk_entry.decrypt.assert_called_once_with("cert_pass")
         mock_jks.pkey_as_pem.assert_called_once_with(mock_pk_entry)
 
-    @patch("src.services.salesforce.jks")
     @patch("src.services.salesforce.constants")
     def test_get_private_key_keystore_load_error(self, mock_constants, mock_jks):
         """Test handling of keystore loading errors."""
@@ -183,7 +295,6 @@ class TestSalesforceService:
         with pytest.raises(Exception, match="Keystore load failed"):
             _get_private_key()
 
-    @patch("src.services.salesforce.jks")
     @patch("src.services.salesforce.constants")
     def test_get_private_key_missing_alias(self, mock_constants, mock_jks):
         """Test handling of missing certificate alias."""
@@ -206,7 +317,6 @@ class TestSalesforceService:
         with pytest.raises(KeyError):
             _get_private_key()
 
-    @patch("src.services.salesforce.jks")
     @patch("src.services.salesforce.constants")
     def test_get_private_key_decrypt_error(self, mock_constants, mock_jks):
         """Test handling of certificate decryption errors."""
@@ -235,12 +345,232 @@ class TestSalesforceService:
             _get_private_key()
 
 
+class TestSalesforceDeadline:
+    """Test Apex calls made within a request's deadline."""
+
+    @pytest.fixture
+    def request_deadline(self):
+        """Serve the test as a request with a 5 second deadline."""
+        request_deadline = deadline.Deadline(5)
+        token = deadline._current.set(request_deadline)
+        deadline.abandoned.clear()
+        yield request_deadline
+        deadline._current.reset(token)
+        deadline.abandoned.clear()
+
+    def _salesforce(self, *chunks: bytes) -> Mock:
+        mock_sf = Mock(spec=Salesforce)
+        mock_sf.apex_url = "https://test.salesforce.com/services/apexrest/"
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.iter_content.return_value = iter(chunks)
+        response.encoding = "utf-8"
+        mock_sf._call_salesforce.return_value = response
+        return mock_sf
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_within_deadline(self, mock_get_salesforce, request_deadline):
+        """Test that the connect and read timeouts add up to the time left."""
+        # Arrange
+        mock_sf = self._salesforce(b'{"result": ', b'"success"}')
+        mock_get_salesforce.return_value = mock_sf
+
+        # Act
+        result = execute_apex("test/endpoint", "GET", {"param": "value"})
+
+        # Assert
+        assert result == {"result": "success"}
+        call = mock_sf._call_salesforce.call_args
+        assert call.args == (
+            "GET",
+            "https://test.salesforce.com/services/apexrest/test/endpoint",
+        )
+        assert call.kwargs["data"] == '{"param": "value"}'
+        assert call.kwargs["stream"] is True
+        connect, read = call.kwargs["timeout"]
+        assert 0 < connect <= 2.5
+        assert 0 < connect + read <= 5
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_text_response(self, mock_get_salesforce, request_deadline):
+        """Test that a body that isn't JSON is returned as text."""
+        # Arrange
+        mock_get_salesforce.return_value = self._salesforce(b"plain ", b"text")
+
+        # Act & Assert
+        assert execute_apex("test/endpoint", "GET", {}) == "plain text"
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_skipped_when_cancelled(
+        self, mock_get_salesforce, request_deadline
+    ):
+        """Test that no call is made once the client has disconnected."""
+        # Arrange
+        mock_sf = self._salesforce()
+        mock_get_salesforce.return_value = mock_sf
+        request_deadline.cancelled.set()
+
+        # Act & Assert
+        with pytest.raises(deadline.RequestCancelled):
+            execute_apex("test/endpoint", "GET", {})
+
+        mock_sf._call_salesforce.assert_not_called()
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_deadline_checked_after_login(
+        self, mock_get_salesforce, request_deadline
+    ):
+        """Test that time spent logging in counts against the deadline."""
+        # Arrange
+        mock_sf = self._salesforce()
+
+        def slow_login():
+            request_deadline.expires = 0
+            return mock_sf
+
+        mock_get_salesforce.side_effect = slow_login
+
+        # Act & Assert
+        with pytest.raises(deadline.DeadlineExceeded):
+            execute_apex("test/endpoint", "GET", {})
+
+        mock_sf._call_salesforce.assert_not_called()
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_cancelled_while_reading(
+        self, mock_get_salesforce, request_deadline
+    ):
+        """Test that reading the response stops once the client disconnects."""
+        # Arrange
+        mock_sf = self._salesforce()
+        response = mock_sf._call_salesforce.return_value
+
+        def chunks():
+            yield b'{"result": '
+            request_deadline.cancelled.set()
+            yield b'"success"}'
+            yield b""
+
+        response.iter_content.return_value = chunks()
+        mock_get_salesforce.return_value = mock_sf
+
+        # Act & Assert
+        with pytest.raises(deadline.RequestCancelled):
+            execute_apex("test/endpoint", "GET", {})
+
+        response.__exit__.assert_called_once()
+        assert deadline.abandoned["cancelled_in_flight"] == 1
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_slow_response(self, mock_get_salesforce, request_deadline):
+        """Test that a response still arriving at the deadline is abandoned."""
+        # Arrange
+        mock_sf = self._salesforce()
+
+        def chunks():
+            yield b'{"result": '
+            request_deadline.expires = 0
+            yield b'"success"}'
+
+        mock_sf._call_salesforce.return_value.iter_content.return_value = chunks()
+        mock_get_salesforce.return_value = mock_sf
+
+        # Act & Assert
+        with pytest.raises(deadline.DeadlineExceeded):
+            execute_apex("test/endpoint", "GET", {})
+
+        assert deadline.abandoned["upstream_timeout"] == 1
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_upstream_timeout(self, mock_get_salesforce, request_deadline):
+        """Test that an upstream timeout is reported as an exceeded deadline."""
+        # Arrange
+        mock_sf = self._salesforce()
+        mock_sf._call_salesforce.side_effect = requests.exceptions.Timeout()
+        mock_get_salesforce.return_value = mock_sf
+
+        # Act & Assert
+        with pytest.raises(deadline.DeadlineExceeded):
+            execute_apex("test/endpoint", "GET", {})
+
+        assert deadline.abandoned["upstream_timeout"] == 1
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_failed_call_not_counted_as_cancelled(
+        self, mock_get_salesforce, request_deadline
+    ):
+        """Test that a call which fails on its own isn't counted as cancelled."""
+        # Arrange
+        mock_sf = self._salesforce()
+
+        def failing_call(*args, **kwargs):
+            request_deadline.cancelled.set()
+            raise SalesforceError("url", 500, "apexecute", "Server error")
+
+        mock_sf._call_salesforce.side_effect = failing_call
+        mock_get_salesforce.return_value = mock_sf
+
+        # Act & Assert
+        with pytest.raises(SalesforceError):
+            execute_apex("test/endpoint", "GET", {})
+
+        assert not deadline.abandoned
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_completed_call_not_counted_as_cancelled(
+        self, mock_get_salesforce, request_deadline
+    ):
+        """Test that a call fully read before the client left isn't counted."""
+        # Arrange
+        mock_sf = self._salesforce()
+
+        def chunks():
+            yield b'{"result": "success"}'
+            request_deadline.cancelled.set()
+
+        mock_sf._call_salesforce.return_value.iter_content.return_value = chunks()
+        mock_get_salesforce.return_value = mock_sf
+
+        # Act & Assert
+        assert execute_apex("test/endpoint", "GET", {}) == {"result": "success"}
+        assert not deadline.abandoned
+
+    @patch("src.services.salesforce._get_salesforce")
+    def test_execute_apex_streams_through_salesforce_client(
+        self, mock_get_salesforce, request_deadline
+    ):
+        """Test the streamed call against the installed simple-salesforce client."""
+        # Arrange
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(b'{"result": "success"}')
+        session = requests.Session()
+        mock_get_salesforce.return_value = Salesforce(
+            instance="test.salesforce.com", session_id="session", session=session
+        )
+
+        # Act
+        with patch.object(session, "request", return_value=response) as mock_request:
+            result = execute_apex("test/endpoint", "POST", {"param": "value"})
+
+        # Assert
+        assert result == {"result": "success"}
+        call = mock_request.call_args
+        assert call.args[0] == "POST"
+        assert call.args[1].startswith("https://test.salesforce.com/services/apexrest/")
+        assert call.args[1].endswith("/test/endpoint")
+        assert call.kwargs["data"] == '{"param": "value"}'
+        assert call.kwargs["stream"] is True
+        assert call.kwargs["headers"]["Authorization"] == "Bearer session"
+        connect, read = call.kwargs["timeout"]
+        assert 0 < connect + read <= 5
+
+
 class TestSalesforceIntegration:
     """Integration tests for Salesforce service."""
 
-    @patch("src.services.salesforce.jks")
     @patch("src.services.salesforce.constants")
-    @patch("src.services.salesforce.Salesforce")
+    @patch("simple_salesforce.Salesforce")
     def test_end_to_end_apex_execution(
         self, mock_salesforce_class, mock_constants, mock_jks
     ):
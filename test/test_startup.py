@@ -0,0 +1,67 @@
+"""Tests for startup warm-up and readiness."""
+
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.util import startup
+
+
+@pytest.fixture(autouse=True)
+def reset_startup():
+    """Reset readiness and phase timings between tests."""
+    startup.ready.clear()
+    startup.timings.clear()
+    yield
+    startup.ready.clear()
+    startup.timings.clear()
+
+
+class TestStartup:
+    """Test startup functions."""
+
+    def test_phase_records_timing(self):
+        """Test that a phase records its duration."""
+        with startup.phase("keystore"):
+            pass
+
+        assert startup.timings["keystore"] >= 0
+
+    def test_phase_records_timing_on_error(self):
+        """Test that a failed phase still records its duration."""
+        with pytest.raises(ValueError), startup.phase("authenticate"):
+            raise ValueError("bad credentials")
+
+        assert "authenticate" in startup.timings
+
+    def test_run_marks_ready(self):
+        """Test that a successful warm-up marks the app as ready."""
+        warm_up = Mock()
+
+        startup.run(warm_up, threading.Event())
+
+        warm_up.assert_called_once()
+        assert startup.ready.is_set()
+        assert "warm_up" in startup.timings
+
+    @patch("src.util.startup.constants")
+    def test_run_retries_failed_warm_up(self, mock_constants):
+        """Test that a failed warm-up is retried until it succeeds."""
+        mock_constants.STARTUP_RETRY_SECONDS = 0
+        warm_up = Mock(side_effect=[Exception("Salesforce unavailable"), None])
+
+        startup.run(warm_up, threading.Event())
+
+        assert warm_up.call_count == 2
+        assert startup.ready.is_set()
+
+    def test_run_stops_without_ready(self):
+        """Test that a stopped warm-up never marks the app as ready."""
+        stop = threading.Event()
+        warm_up = Mock(side_effect=lambda: stop.set() or 1 / 0)
+
+        startup.run(warm_up, stop)
+
+        warm_up.assert_called_once()
+        assert not startup.ready.is_set()